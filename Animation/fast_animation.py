@@ -0,0 +1,80 @@
+# Animation layer shared by the model scripts: frames decimated to the target fps,
+# blitting of the artists that change and trails capped to a ring buffer.
+import numpy as np
+from matplotlib.animation import FuncAnimation
+from matplotlib.transforms import Bbox
+
+def frame_indices(t, fps=25, speed=1):
+    """Indices of the time grid t shown when playing `speed` simulated seconds per second at fps.
+
+    The last point of t is always included.
+    """
+    t = np.asarray(t)
+    idx = np.searchsorted(t, np.arange(t[0], t[-1], speed/fps))
+    return np.unique(np.append(idx, len(t)-1))
+
+def text_axes(fig, x, y, s, transform, margin=0.3, **kwargs):
+    """Text at (x, y) of `transform` drawn in its own small axes.
+
+    Blitting only refreshes the axes of each animated artist, so texts placed
+    outside their axes (titles, clocks) get a dedicated axes sized to the text
+    box of s plus `margin` (for changing digits), and each frame restores and
+    blits only that small region. The axes is placed again on every full draw,
+    so it follows aspect adjustments, layout changes and resizes.
+    """
+    ax = fig.add_axes([0, 0, 1, 1], frameon=False)
+    ax.set_axis_off()
+    ax.set_navigate(False)
+    text = ax.text(x, y, s, transform=transform, **kwargs)
+
+    def locator(ax, renderer):
+        current = text.get_text()
+        text.set_text(s)
+        bbox = text.get_window_extent(renderer)
+        if text.get_bbox_patch() is not None:
+            text.update_bbox_position_size(renderer)
+            bbox = Bbox.union([bbox, text.get_bbox_patch().get_window_extent(renderer)])
+        text.set_text(current)
+        return bbox.expanded(1 + margin, 1 + margin).transformed(fig.transFigure.inverted())
+
+    ax.set_axes_locator(locator)
+    return text
+
+class Trail:
+    """Line that shows only the last `length` points appended to it.
+
+    Points are stored twice in a mirrored ring buffer, at j and j+length, so
+    the newest `length` points are always a contiguous view handed to the line
+    without copying or growing arrays.
+    """
+    def __init__(self, line, length):
+        self.line = line
+        self.length = length
+        self.clear()
+
+    def clear(self):
+        self._buf = np.full((2, 2*self.length), np.nan)
+        self._n = 0
+        self._last = -1
+        self.line.set_data([], [])
+
+    def extend(self, x, y):
+        xy = np.array([np.atleast_1d(x), np.atleast_1d(y)], dtype=float)[:, -self.length:]
+        j = (self._n + np.arange(xy.shape[1])) % self.length
+        self._buf[:, j] = self._buf[:, j+self.length] = xy
+        self._n += xy.shape[1]
+        start = self._n % self.length
+        view = self._buf[:, start:start+self.length] if self._n >= self.length else self._buf[:, :self._n]
+        self.line.set_data(view[0], view[1])
+
+    def follow(self, x, y, i):
+        """Show the precomputed trajectory x, y up to index i, appending the points skipped since the last call."""
+        if i < self._last:
+            self.clear()
+        self.extend(x[self._last+1:i+1], y[self._last+1:i+1])
+        self._last = i
+
+def blit_animation(fig, update, frames, init=None, fps=25, repeat=False, **kwargs):
+    """FuncAnimation played at fps that blits the artists returned by update(i) (and init())."""
+    return FuncAnimation(fig, update, frames=frames, init_func=init, interval=1000/fps, blit=True,
+                         repeat=repeat, **kwargs)
@@ -1,6 +1,13 @@
+import os
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.animation import PillowWriter
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pendulum_Integrators'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Animation'))
+from symplectic import damped_pendulum_sweep
+from fast_animation import Trail, blit_animation, frame_indices, text_axes
 
 # Swich to True to show the animation in real time
 plotRealTime = True
@@ -10,8 +17,11 @@ g = 9.81
 k = 0.3
 L = 1
 
+# Integration scheme: 'euler' (semi-implicit Euler, needs delta_t = 0.001), 'verlet' or 'yoshida4'
+integrator = 'yoshida4'
+
 #Integration interval in sec
-delta_t = 0.001
+delta_t = 0.01
 
 #Time to simulate in sec
 t_end = 50
@@ -21,19 +31,37 @@ theta_dot_0 = np.pi*1
 
 # Animation
 fps = 25
+trail_time = 10 # seconds of history drawn in the time plots
 
-theta = [theta_0]
-theta_dot = [theta_dot_0]
-Kin_e = [0.5*theta_dot_0**2]
-t_grid = np.arange(0, t_end, delta_t)
+# Parameter study: every (k, L, theta_0) combination integrated at once as a batch
+run_sweep = False
+sweep_k = np.array([0.1, 0.3, 1])
+sweep_L = np.array([0.5, 1, 2])
+sweep_theta_0 = np.array([0.5, 1.5, 3])
+sweep_substeps = 10 # integration steps between stored points
 
-def theta_dot_dot(x,x_dot):
-    return -k * x_dot - g / L * np.sin(x)
+t_grid = np.arange(0, t_end, delta_t)
 
-for _ in t_grid[1:]:
-    theta_dot.append(theta_dot[-1] + delta_t * theta_dot_dot(theta[-1],theta_dot[-1]))
-    theta.append(theta[-1] + delta_t * theta_dot[-1])
-    Kin_e.append(0.5*theta_dot[-1]**2)
+# Written into preallocated arrays; the symplectic schemes solve the damping
+# exactly around a Verlet step ('yoshida4' composes that damped step to 4th order)
+theta, theta_dot = damped_pendulum_sweep(k, L, theta_0, theta_dot_0, t_grid, integrator)
+Kin_e = 0.5*theta_dot**2
+
+if run_sweep:
+    K, LL, TH0 = np.meshgrid(sweep_k, sweep_L, sweep_theta_0, indexing='ij')
+    t_sweep = np.arange(0, t_end, delta_t*sweep_substeps)
+    th, th_dot = damped_pendulum_sweep(K.ravel(), LL.ravel(), TH0.ravel(), 0, t_sweep, integrator, sweep_substeps)
+    # Energy per unit mass above the rest position, 1 - cos written as 2 sin^2 to avoid cancellation
+    E = 0.5*(LL.ravel()*th_dot)**2 + 2*g*LL.ravel()*np.sin(th/2)**2
+    fig_sweep, ax_sweep = plt.subplots(figsize=(7,5), facecolor='.85')
+    E = (E/E[0]).reshape(len(t_sweep), len(sweep_k), -1)
+    for i, color in enumerate(plt.cm.viridis(np.linspace(0, 1, len(sweep_k)))):
+        lines = ax_sweep.semilogy(t_sweep, E[:,i], color=color, lw=.8)
+        lines[0].set_label('k = {:g}'.format(sweep_k[i]))
+    ax_sweep.set_xlabel('t (s)', fontsize=10)
+    ax_sweep.set_ylabel(r'$E/E_0$', fontsize=10)
+    ax_sweep.set_title('Energy decay for every (k, L, ${\\theta}_0$)')
+    ax_sweep.legend()
 
 thisx, thisy = np.sin(theta),-np.cos(theta)
 
@@ -56,15 +84,17 @@ ax4.set_xlim(-1.5,1.5)
 ax4.set_ylim(-1.5,1.5)
 [ax.set_xlim(0,t_end) for ax in [ax1,ax2,ax3]]
 
-n = 1000
+# Trail of the last second of motion
+n = int(round(1 / delta_t))
 colors= np.zeros((n,4))
 colors[:,3] = np.linspace(0, 1, n, endpoint=True)
 scatter = ax4.scatter(np.zeros(n), np.zeros(n), s = 1,
             facecolor = colors, edgecolor='none', zorder=-100)
 
-line_ax1, = ax1.plot([], [],'k')
-line_ax2, = ax2.plot([], [],'k')
-line_ax3, = ax3.plot([], [],'k')
+n_hist = int(round(trail_time / delta_t))
+trail_ax1 = Trail(ax1.plot([], [],'k')[0], n_hist)
+trail_ax2 = Trail(ax2.plot([], [],'k')[0], n_hist)
+trail_ax3 = Trail(ax3.plot([], [],'k')[0], n_hist)
 line1, = ax4.plot([0,1], [0,1], '-', color='k', lw=12, solid_capstyle='round')
 line2, = ax4.plot([], [], '-', color='w', lw=10, solid_capstyle='round', zorder=2)
 line3, = ax4.plot([], [], 'o', color='k', markersize=2, zorder=3)
@@ -72,7 +102,7 @@ line4, = ax4.plot([], [], 'o', color='k', markersize=25, zorder=1)
 line = [line1, line2, line3, line4]
 
 time_template = 'Time = {:3.1f}s'.format
-p = ax4.text(-1,2, time_template,fontsize=20, style='italic',bbox={'facecolor': 'white', 'alpha': 1, 'pad': 10})
+p = text_axes(fig, -1,2, time_template(0),transform=ax4.transData,fontsize=20, style='italic',bbox={'facecolor': 'white', 'alpha': 1, 'pad': 10})
 ax1.plot(t_grid,theta,'k',linewidth=.2,alpha=0.2)
 ax2.plot(t_grid,theta_dot,'k',linewidth=.2,alpha=0.2)
 ax3.plot(t_grid,Kin_e,'k',linewidth=.2,alpha=0.2)
@@ -80,19 +110,19 @@ ax3.plot(t_grid,Kin_e,'k',linewidth=.2,alpha=0.2)
 def animate(i):
     x_cord = [0,thisx[i]]
     y_cord = [0,thisy[i]]
-    line_ax1.set_data(t_grid[:i],theta[:i])
-    line_ax2.set_data(t_grid[:i],theta_dot[:i])
-    line_ax3.set_data(t_grid[:i],Kin_e[:i])
+    trail_ax1.follow(t_grid,theta,i)
+    trail_ax2.follow(t_grid,theta_dot,i)
+    trail_ax3.follow(t_grid,Kin_e,i)
     line[0].set_data(x_cord, y_cord)
     line[1].set_data(x_cord, y_cord)
     line[2].set_data(x_cord, y_cord)
-    line[3].set_data(thisx[i], thisy[i])
+    line[3].set_data([thisx[i]], [thisy[i]])
     scatter.set_offsets(np.c_[thisx[max(i-n,0):i],thisy[max(i-n,0):i]])
     p.set_text(time_template(t_grid[i]))
+    return [trail_ax1.line, trail_ax2.line, trail_ax3.line, scatter, *line, p]
 
 if plotRealTime:
-    every_x_frame = 1 / (delta_t*fps)
-    an = FuncAnimation(fig, animate, frames= np.arange(0,len(t_grid),int(every_x_frame)), interval=20, repeat=False)
+    an = blit_animation(fig, animate, frame_indices(t_grid, fps), fps=fps)
 else:
     animate(len(t_grid)-1)
 
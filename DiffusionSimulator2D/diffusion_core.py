@@ -0,0 +1,327 @@
+# Núcleo de la simulación de difusión de partículas, sin dependencias gráficas.
+# particle_diffusion_entropy.py lo usa para la animación y simular()/barrido()
+# permiten ejecutarlo sin renderizar (p. ej. barridos de semillas o de percent).
+import heapq
+from math import inf, sqrt
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+def pares_cercanos(pos, L, d):
+    # Pares (i, j) con i < j y distancia < d, buscando sólo en celdas vecinas de
+    # una rejilla uniforme de lado >= d (lista de celdas, O(n) en promedio).
+    nc = max(int(L // d), 1)
+    c = np.clip((pos * (nc / L)).astype(int), 0, nc - 1)
+    key = c[:, 0] * nc + c[:, 1]
+    order = np.argsort(key, kind='stable')
+    cuenta = np.bincount(key, minlength=nc * nc)
+    fin = np.cumsum(cuenta)
+    inicio = fin - cuenta
+    I, J = [], []
+    # La propia celda y 4 de las 8 vecinas: cada par de celdas se visita una sola vez
+    for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        cx, cy = c[:, 0] + dx, c[:, 1] + dy
+        ii = np.nonzero((cx >= 0) & (cx < nc) & (cy >= 0) & (cy < nc))[0]
+        k = cx[ii] * nc + cy[ii]
+        cnt = fin[k] - inicio[k]
+        i = np.repeat(ii, cnt)
+        j = order[np.repeat(inicio[k] - np.cumsum(cnt) + cnt, cnt) + np.arange(cnt.sum())]
+        if dx == 0 and dy == 0:
+            i, j = i[i < j], j[i < j]
+        I.append(i)
+        J.append(j)
+    i, j = np.concatenate(I), np.concatenate(J)
+    rij = pos[i] - pos[j]
+    cerca = np.einsum('ij,ij->i', rij, rij) < d * d
+    i, j = np.minimum(i[cerca], j[cerca]), np.maximum(i[cerca], j[cerca])
+    orden = np.lexsort((j, i))
+    return i[orden], j[orden]
+
+def suma_por_particula(idx, w, n):
+    # Scatter-add: suma las filas de w (m, 2) sobre las partículas idx
+    return np.stack([np.bincount(idx, w[:, 0], n), np.bincount(idx, w[:, 1], n)], axis=1)
+
+def paso(pos, vel, L, r, dt):
+    # Avanza un paso dt modificando pos y vel in situ, sin bucles en Python.
+    pos += vel * dt
+
+    # Rebotes con paredes
+    fuera = (pos - r <= 0) | (pos + r >= L)
+    vel[fuera] *= -1
+    np.clip(pos, r, L - r, out=pos)
+
+    # Colisiones elásticas entre todos los pares solapados del paso. Se resuelven
+    # por rondas de pares disjuntos (cada partícula en un solo par por ronda), así
+    # cada ronda es un conjunto de choques binarios que conserva momento y energía;
+    # el impulso de cada par se suma a i y se resta a j.
+    i, j = pares_cercanos(pos, L, 2 * r)
+    rij = pos[i] - pos[j]
+    dist_sq = np.einsum('ij,ij->i', rij, rij)
+    ok = dist_sq > 0
+    i, j, rij, dist_sq = i[ok], j[ok], rij[ok], dist_sq[ok]
+    pendiente = np.arange(len(i))
+    while len(pendiente):
+        primero = np.full(len(pos), len(i))
+        np.minimum.at(primero, i[pendiente], pendiente)
+        np.minimum.at(primero, j[pendiente], pendiente)
+        ronda = (primero[i[pendiente]] == pendiente) & (primero[j[pendiente]] == pendiente)
+        k = pendiente[ronda]
+        vij = vel[i[k]] - vel[j[k]]
+        dv = (np.einsum('ij,ij->i', vij, rij[k]) / dist_sq[k])[:, None] * rij[k]
+        vel -= suma_por_particula(i[k], dv, len(pos)) - suma_por_particula(j[k], dv, len(pos))
+        pendiente = pendiente[~ronda]
+
+    # Separación de los solapamientos
+    dist = np.sqrt(dist_sq)
+    dp = (0.5 * (2 * r - dist) / dist)[:, None] * rij
+    pos += suma_por_particula(i, dp, len(pos)) - suma_por_particula(j, dp, len(pos))
+
+def posiciones_sin_solape(n, L, r, percent):
+    # Red cuadrada centrada en la caja dentro de la misma región que la
+    # inicialización aleatoria; si no cabe, con la separación mínima 2r.
+    lado = int(np.ceil(np.sqrt(n)))
+    ancho = 2 * (1 - percent) * (L * 0.5 - r)
+    sep = max(ancho / lado, 2 * r * (1 + 1e-6))
+    if (lado - 1) * sep > L - 2 * r:
+        raise ValueError(f"{n} particles of radius {r} do not fit in a box of size {L}")
+    g = L * 0.5 + (np.arange(lado) - (lado - 1) / 2) * sep
+    gx, gy = np.meshgrid(g, g)
+    return np.column_stack((gx.ravel(), gy.ravel()))[:n]
+
+class SimuladorEventos:
+    # Dinámica de discos duros dirigida por eventos: salta de un evento al
+    # siguiente usando una cola de prioridad. Eventos: choque entre partículas,
+    # choque con una pared y cruce de celda de una rejilla de lado >= 2r, así
+    # cada predicción sólo mira las partículas de las 9 celdas vecinas (como
+    # pares_cercanos). Cada partícula guarda su posición en el instante de su
+    # último evento (tp) y cada evento sólo mueve a sus partículas: O(1) por
+    # evento en promedio. Cada partícula tiene en la cola sólo su próximo
+    # evento; los obsoletos se descartan al sacarlos comparando el nº de choques
+    # de cada partícula (invalidación perezosa). El estado interno son listas de
+    # Python porque el bucle de eventos es escalar; avanzar() vuelca pos y vel
+    # (modificados in situ) en el instante pedido.
+    def __init__(self, pos, vel, L, r, lado_celda=None):
+        if len(pares_cercanos(pos, L, 2 * r)[0]):
+            raise ValueError("Event-driven mode needs non-overlapping particles, "
+                             "use posiciones_sin_solape()")
+        self.pos, self.vel, self.L, self.r = pos, vel, L, r
+        self.t = 0.0
+        self.nc = max(int(L // max(2 * r, lado_celda or 0)), 1)
+        self.lado = L / self.nc
+        self.x, self.y = pos[:, 0].tolist(), pos[:, 1].tolist()
+        self.vx, self.vy = vel[:, 0].tolist(), vel[:, 1].tolist()
+        self.tp = [0.0] * len(pos)
+        self.choques = [0] * len(pos)
+        c = np.clip((pos * (self.nc / L)).astype(int), 0, self.nc - 1)
+        self.cx, self.cy = c[:, 0].tolist(), c[:, 1].tolist()
+        # Rejilla con un borde de celdas vacías: la celda (cx, cy) es
+        # (cx+1)*(nc+2) + cy+1 y sus vecinas están a desplazamientos fijos
+        m = self.nc + 2
+        self.celdas = [[] for _ in range(m * m)]
+        for i, k in enumerate((c[:, 0] + 1) * m + c[:, 1] + 1):
+            self.celdas[k].append(i)
+        self.desplazamientos = [dx * m + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+        self.eventos = []
+        for i in range(len(pos)):
+            self.predecir(i)
+
+    def mover(self, i):
+        # Lleva la partícula i al instante actual
+        dt = self.t - self.tp[i]
+        self.x[i] += self.vx[i] * dt
+        self.y[i] += self.vy[i] * dt
+        self.tp[i] = self.t
+
+    def predecir(self, i):
+        # Próximo evento de i: pared (j = -1 en x, -2 en y), cruce de celda
+        # (j = -3 en x, -4 en y) o choque con una partícula j de las celdas vecinas
+        t, r, lado = self.t, self.r, self.lado
+        x, y, vx, vy, tp = self.x, self.y, self.vx, self.vy, self.tp
+        vxi, vyi, cx, cy = vx[i], vy[i], self.cx[i], self.cy[i]
+        xi, yi = x[i] + vxi * (t - tp[i]), y[i] + vyi * (t - tp[i])
+        x[i], y[i], tp[i] = xi, yi, t
+        # Pared o borde de celda más próximo en cada eje (la pared de un eje
+        # siempre está dentro de la celda del borde)
+        tmin, jmin = inf, 0
+        if vxi:
+            tw, tc = ((self.L - r - xi) / vxi, ((cx + 1) * lado - xi) / vxi) if vxi > 0 else \
+                     ((r - xi) / vxi, (cx * lado - xi) / vxi)
+            tmin, jmin = (tw, -1) if tw <= tc else (tc, -3)
+        if vyi:
+            tw, tc = ((self.L - r - yi) / vyi, ((cy + 1) * lado - yi) / vyi) if vyi > 0 else \
+                     ((r - yi) / vyi, (cy * lado - yi) / vyi)
+            if min(tw, tc) < tmin:
+                tmin, jmin = (tw, -2) if tw <= tc else (tc, -4)
+        # Choque: |dp + dv*s| = 2r acercándose
+        d2 = 4 * r * r
+        celdas, k = self.celdas, (cx + 1) * (self.nc + 2) + cy + 1
+        for d in self.desplazamientos:
+            for j in celdas[k + d]:
+                if j == i:
+                    continue
+                s = t - tp[j]
+                dx, dy = xi - x[j] - vx[j] * s, yi - y[j] - vy[j] * s
+                dvx, dvy = vxi - vx[j], vyi - vy[j]
+                b = dx * dvx + dy * dvy
+                if b >= 0:
+                    continue
+                dv2 = dvx * dvx + dvy * dvy
+                disc = b * b - dv2 * (dx * dx + dy * dy - d2)
+                if disc <= 0:
+                    continue
+                tc = (-b - sqrt(disc)) / dv2
+                if tc < tmin:
+                    tmin, jmin = tc, j
+        if tmin < inf:
+            heapq.heappush(self.eventos, (t + max(tmin, 0), i, jmin, self.choques[i],
+                                          self.choques[jmin] if jmin >= 0 else 0))
+
+    def cruzar(self, i, eje):
+        # Cambia la partícula i a la celda vecina en la dirección de su velocidad
+        m = self.nc + 2
+        self.celdas[(self.cx[i] + 1) * m + self.cy[i] + 1].remove(i)
+        if eje == 0:
+            self.cx[i] += 1 if self.vx[i] > 0 else -1
+        else:
+            self.cy[i] += 1 if self.vy[i] > 0 else -1
+        self.celdas[(self.cx[i] + 1) * m + self.cy[i] + 1].append(i)
+
+    def avanzar(self, t_fin):
+        # Procesa los eventos hasta t_fin y deja las partículas en t_fin
+        if t_fin < self.t:
+            raise ValueError("t_fin = {} is before the current time t = {}".format(t_fin, self.t))
+        x, y, vx, vy, choques, eventos = self.x, self.y, self.vx, self.vy, self.choques, self.eventos
+        while eventos and eventos[0][0] <= t_fin:
+            te, i, j, ci, cj = heapq.heappop(eventos)
+            if ci != choques[i]:
+                continue
+            self.t = te
+            if j >= 0:
+                if cj != choques[j]:
+                    # j cambió de trayectoria: i sigue igual pero necesita nuevo evento
+                    self.predecir(i)
+                    continue
+                self.mover(i)
+                self.mover(j)
+                dx, dy = x[i] - x[j], y[i] - y[j]
+                f = ((vx[i] - vx[j]) * dx + (vy[i] - vy[j]) * dy) / (dx * dx + dy * dy)
+                vx[i] -= f * dx
+                vy[i] -= f * dy
+                vx[j] += f * dx
+                vy[j] += f * dy
+                choques[i] += 1
+                choques[j] += 1
+                self.predecir(i)
+                self.predecir(j)
+            elif j >= -2:
+                self.mover(i)
+                if j == -1:
+                    vx[i] = -vx[i]
+                else:
+                    vy[i] = -vy[i]
+                choques[i] += 1
+                self.predecir(i)
+            else:
+                # Cruce de celda: la trayectoria no cambia, sólo los vecinos
+                self.cruzar(i, -3 - j)
+                self.predecir(i)
+        self.t = t_fin
+        s = t_fin - np.array(self.tp)
+        self.pos[:, 0] = np.array(x) + np.array(vx) * s
+        self.pos[:, 1] = np.array(y) + np.array(vy) * s
+        self.vel[:, 0] = vx
+        self.vel[:, 1] = vy
+
+def calcular_entropia(pos, L, grid_size):
+    # matriz 2D con numero de partículas por celda.
+    H, _, _ = np.histogram2d(pos[:, 0], pos[:, 1], bins=grid_size, range=[[0, L], [0, L]])
+    # Convierte la matriz H en un vector 1D | lista de cantidades de partículas por celda.
+    p = H.flatten() 
+    # 1D array de probabilidades, eliminando las celdas con 0 partículas.
+    p = p[p > 0] / np.sum(p) 
+    # Calculo de la entropía de Shannon.
+    S = -np.sum(p * np.log(p))
+    return S
+
+def xlogx(c):
+    # c*log(c) con 0*log(0) = 0
+    return c * np.log(np.maximum(c, 1))
+
+class EntropiaIncremental:
+    # Entropía de Shannon de la ocupación de la rejilla, actualizada sólo en las
+    # celdas que ganan o pierden partículas. Con N partículas y c_i por celda:
+    # S = -sum(p_i log p_i) = log(N) - sum(c_i log c_i) / N, y se mantiene la suma.
+    def __init__(self, pos, L, grid_size):
+        self.L, self.grid_size = L, grid_size
+        self.celdas = self.celda(pos)
+        self.cuenta = np.bincount(self.celdas, minlength=grid_size**2).astype(float)
+        self.suma = xlogx(self.cuenta).sum()
+
+    def celda(self, pos):
+        c = np.clip((pos * (self.grid_size / self.L)).astype(int), 0, self.grid_size - 1)
+        return c[:, 0] * self.grid_size + c[:, 1]
+
+    def actualizar(self, pos, idx=None):
+        # idx: partículas que se han movido (por defecto todas). Devuelve S.
+        idx = np.arange(len(self.celdas)) if idx is None else np.asarray(idx)
+        nueva = self.celda(pos[idx])
+        cambia = nueva != self.celdas[idx]
+        if cambia.any():
+            sale, entra = self.celdas[idx[cambia]], nueva[cambia]
+            afectadas = np.unique(np.concatenate((sale, entra)))
+            self.suma -= xlogx(self.cuenta[afectadas]).sum()
+            np.subtract.at(self.cuenta, sale, 1)
+            np.add.at(self.cuenta, entra, 1)
+            self.suma += xlogx(self.cuenta[afectadas]).sum()
+            self.celdas[idx[cambia]] = entra
+        return self.entropia()
+
+    def entropia(self):
+        N = len(self.celdas)
+        return np.log(N) - self.suma / N
+
+def condiciones_iniciales(n, L, r, percent, seed=1, modo='pasos'):
+    # Posiciones en el cuadrado central (percent: 0 muy separado y 1 muy pegado)
+    # y velocidades uniformes en [-1, 1]. En modo 'eventos' las posiciones se
+    # colocan en red para que no haya solapes.
+    rng = np.random.RandomState(seed)
+    pos = rng.uniform(r + percent * (L * 0.5 - r), L * 0.5 + (1 - percent) * (L * 0.5 - r), size=(n, 2))
+    vel = rng.uniform(-1, 1, size=(n, 2))
+    if modo == 'eventos':
+        pos = posiciones_sin_solape(n, L, r, percent)
+    return pos, vel
+
+def simular(n=200, L=10, r=0.1, dt=0.05, tiempo=10, grid_size=20, percent=0.9, seed=1,
+            modo='pasos', cada=0):
+    # Ejecuta la simulación sin gráficos. Devuelve (t, entropias, snapshots):
+    # la entropía tras cada paso y, si cada > 0, las posiciones cada `cada` pasos.
+    steps = int(tiempo / dt)
+    pos, vel = condiciones_iniciales(n, L, r, percent, seed, modo)
+    eventos = SimuladorEventos(pos, vel, L, r) if modo == 'eventos' else None
+    entropia = EntropiaIncremental(pos, L, grid_size)
+    entropias = np.empty(steps)
+    snapshots = []
+    for k in range(steps):
+        if eventos is not None:
+            eventos.avanzar((k + 1) * dt)
+        else:
+            paso(pos, vel, L, r, dt)
+        entropias[k] = entropia.actualizar(pos)
+        if cada and (k + 1) % cada == 0:
+            snapshots.append(pos.copy())
+    snapshots = np.array(snapshots) if snapshots else np.empty((0, n, 2))
+    return (np.arange(steps) + 1) * dt, entropias, snapshots
+
+def _simular_kw(kw):
+    return simular(**kw)
+
+def barrido(configuraciones, n_procesos=None):
+    # Ejecuta simular(**cfg) para cada diccionario de configuraciones en un pool
+    # de procesos, p. ej. [dict(seed=s, percent=p) for s in ... for p in ...].
+    with ProcessPoolExecutor(n_procesos) as pool:
+        return list(pool.map(_simular_kw, configuraciones))
+
+if __name__ == '__main__':
+    # Ejemplo: entropía final para varias semillas y dispersiones iniciales
+    configs = [dict(seed=s, percent=p) for s in range(4) for p in (0.5, 0.7, 0.9)]
+    for cfg, (t, S, _) in zip(configs, barrido(configs)):
+        print(f"seed={cfg['seed']} percent={cfg['percent']:.1f} -> S(t={t[-1]:.1f} s) = {S[-1]:.4f}")
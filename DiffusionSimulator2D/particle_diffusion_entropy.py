@@ -1,6 +1,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, PillowWriter
+from diffusion_core import EntropiaIncremental, SimuladorEventos, condiciones_iniciales, paso
 
 # Parámetros
 n = 200  # number of particles
@@ -10,13 +11,13 @@ dt = 0.05
 time = 10 # simulation time
 
 grid_size = 20  # Para el cálculo de entropía
+modo = 'pasos'  # 'pasos': paso fijo dt | 'eventos': discos duros dirigidos por eventos (exacto)
+guardar_gif = True  # False para sólo mostrar la animación
 steps = int(time / dt)  # número de pasos de tiempo
 
 # Inicialización
-np.random.seed(1)
 percent = 0.9  # 0 muy separado y 1 muy pegado
-pos = np.random.uniform(r + percent * (L * 0.5 - r), L * 0.5 + (1 - percent) * (L * 0.5 - r), size=(n, 2))
-vel = np.random.uniform(-1, 1, size=(n, 2))
+pos, vel = condiciones_iniciales(n, L, r, percent, seed=1, modo=modo)
 
 fig, (ax_particles, ax_entropy) = plt.subplots(1, 2, figsize=(10, 6), facecolor='.85')
 fig.subplots_adjust(top=0.9)
@@ -45,26 +46,8 @@ ax_entropy.set_ylim(0, 10)  # puedes ajustar según lo que veas
 ax_entropy.set_xlabel("Time (s)")
 ax_entropy.set_ylabel("Entropy")
 
-def colision_elastica(i, j):
-    rij = pos[i] - pos[j]
-    vij = vel[i] - vel[j]
-    dist_sq = np.dot(rij, rij)
-    if dist_sq == 0:
-        return
-    factor = np.dot(vij, rij) / dist_sq
-    vel[i] -= factor * rij
-    vel[j] += factor * rij
-
-def calcular_entropia(pos, L, grid_size):
-    # matriz 2D con numero de partículas por celda.
-    H, _, _ = np.histogram2d(pos[:, 0], pos[:, 1], bins=grid_size, range=[[0, L], [0, L]])
-    # Convierte la matriz H en un vector 1D | lista de cantidades de partículas por celda.
-    p = H.flatten() 
-    # 1D array de probabilidades, eliminando las celdas con 0 partículas.
-    p = p[p > 0] / np.sum(p) 
-    # Calculo de la entropía de Shannon.
-    S = -np.sum(p * np.log(p))
-    return S
+eventos = SimuladorEventos(pos, vel, L, r) if modo == 'eventos' else None
+entropia = EntropiaIncremental(pos, L, grid_size)
 
 def init():
     particles.set_data([], [])
@@ -75,34 +58,17 @@ def init():
 def update(frame):
     global pos, vel
 
-    # Actualizar posiciones
-    pos += vel * dt
-
-    # Rebotes con paredes
-    for i in range(n):
-        for d in range(2):
-            if pos[i, d] - r <= 0 or pos[i, d] + r >= L:
-                vel[i, d] *= -1
-                pos[i, d] = np.clip(pos[i, d], r, L - r)
-
-    # Colisiones entre partículas
-    for i in range(n):
-        for j in range(i + 1, n):
-            rij = pos[i] - pos[j]
-            dist = np.linalg.norm(rij)
-            if dist < 2 * r:
-                colision_elastica(i, j)
-                if dist > 0:
-                    overlap = 2 * r - dist
-                    direction = rij / dist
-                    pos[i] += 0.5 * overlap * direction
-                    pos[j] -= 0.5 * overlap * direction
+    # Actualizar posiciones, paredes y colisiones
+    if modo == 'eventos':
+        eventos.avanzar(eventos.t + dt)
+    else:
+        paso(pos, vel, L, r, dt)
 
     # Actualizar partículas
     particles.set_data(pos[:, 0], pos[:, 1])
 
     # Calcular y actualizar entropía
-    S = calcular_entropia(pos, L, grid_size)
+    S = entropia.actualizar(pos)
     entropias.append(S)
     t_vals = np.arange(len(entropias)) * dt
     line_entropy.set_data(t_vals, entropias)
@@ -120,10 +86,11 @@ ani = FuncAnimation(fig, update, frames=steps, init_func=init, interval=50, blit
 
 plt.tight_layout()
 
-print('guardando la animación ...')
-writer = PillowWriter(fps=40)
-ani.save("particle_diffusion.gif", writer=writer)
-print('Animación guardada !!!')
+if guardar_gif:
+    print('guardando la animación ...')
+    writer = PillowWriter(fps=40)
+    ani.save("particle_diffusion.gif", writer=writer)
+    print('Animación guardada !!!')
 
 # Mostrar la figura
 plt.show()
\ No newline at end of file
@@ -0,0 +1,32 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from pendulum_ensemble import chaos_map
+
+# Grid of initial angles (degrees), both masses released at rest
+n_grid = 64 # 512 for a high resolution map
+theta1_degrees = np.linspace(-180, 180, n_grid)
+theta2_degrees = np.linspace(-180, 180, n_grid)
+
+tmax = 20 # max time
+delta_t = 0.01
+L1, L2 = 3, 2 # Pendulum rod lengths (m)
+m1, m2 = 2, 3 # masses (kg)
+n_workers = None # Number of processes (None -> all cores)
+
+if __name__ == '__main__':
+    lyapunov, flip_time = chaos_map(np.radians(theta1_degrees), np.radians(theta2_degrees), tmax, delta_t,
+                                    L1, L2, m1, m2, n_workers=n_workers)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(13,6), facecolor='.85')
+    fig.suptitle('Double pendulum chaos maps', fontsize=20, weight='semibold')
+    extent = [theta1_degrees[0], theta1_degrees[-1], theta2_degrees[0], theta2_degrees[-1]]
+    im1 = ax1.imshow(lyapunov, origin='lower', extent=extent, cmap='inferno')
+    fig.colorbar(im1, ax=ax1, label=r'$\lambda_{max}$ (1/s)')
+    ax1.set_title('Largest Lyapunov exponent')
+    im2 = ax2.imshow(np.log10(flip_time), origin='lower', extent=extent, cmap='viridis')
+    fig.colorbar(im2, ax=ax2, label=r'$\log_{10}$ time to flip (s)')
+    ax2.set_title('Time to flip (blank: no flip)')
+    for ax in (ax1, ax2):
+        ax.set_xlabel(r'$\theta_1$ (deg)', fontsize=12)
+        ax.set_ylabel(r'$\theta_2$ (deg)', fontsize=12)
+    plt.show()
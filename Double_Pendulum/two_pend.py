@@ -1,21 +1,13 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import odeint
-from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.animation import PillowWriter
 
-def double_pendulum_model(y, t, L1, L2, m1, m2):
-    """Return the first derivatives of y = theta1, z1, theta2, z2."""
-    theta1, z1, theta2, z2 = y
-
-    c, s = np.cos(theta1-theta2), np.sin(theta1-theta2)
-
-    theta1dot = z1
-    z1dot = (m2*g*np.sin(theta2)*c - m2*s*(L1*z1**2*c + L2*z2**2) -
-             (m1+m2)*g*np.sin(theta1)) / L1 / (m1 + m2*s**2)
-    theta2dot = z2
-    z2dot = ((m1+m2)*(L1*z1**2*s - g*np.sin(theta2) + g*np.sin(theta1)*c) + 
-             m2*L2*z2**2*s*c) / L2 / (m1 + m2*s**2)
-    return theta1dot, z1dot, theta2dot, z2dot
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Animation'))
+from pendulum_ensemble import double_pendulum_model
+from fast_animation import Trail, blit_animation, frame_indices, text_axes
 
 def get_xy(theta1, theta2, L1, L2):
     x1 = L1 * np.sin(theta1)
@@ -27,7 +19,7 @@ def get_xy(theta1, theta2, L1, L2):
 tmax = 20 # max time
 delta_t = 0.01
 t = np.arange(0, tmax, delta_t)
-g = 9.81 # The gravitational acceleration (m.s-2).
+trail_time = 10 # seconds of trajectory kept on screen
 
 ################################################
 # First pendulum 
@@ -53,7 +45,7 @@ x1_p1, y1_p1, x2_p1, y2_p1 = get_xy(theta1_p1, theta2_p1, L1_p1, L2_p1)
 fig, ax  = plt.subplots(figsize=(8,8),facecolor='.85')
 fig.suptitle('Double pendulum',fontsize=25,x=0.5,y=.94,weight='semibold')
 # Plot the results
-m2_p1_trajectory, = ax.plot([], [], alpha=.4, color='skyblue', lw=3)
+m2_p1_trajectory = Trail(ax.plot([], [], alpha=.4, color='skyblue', lw=3)[0], int(round(trail_time/delta_t)))
 line_m1_p1_back, = ax.plot([0,x1_p1[0]], [0,y1_p1[0]], '-', color='k', lw=4, solid_capstyle='round')
 line_m1_p1_front, = ax.plot([0,x1_p1[0]], [0,y1_p1[0]], '-', color='w', lw=2, solid_capstyle='round', zorder=2)
 m1_p1_dot, = ax.plot(x1_p1[0], y1_p1[0], 'o', markeredgecolor='black', markeredgewidth=1, color='skyblue', markersize=m1_p1*10, zorder=3)
@@ -85,7 +77,7 @@ x1_p2, y1_p2, x2_p2, y2_p2 = get_xy(theta1_p2, theta2_p2, L1_p2, L2_p2)
 
 # Plot the results
 
-m2_p2_trajectory, = ax.plot([], [], alpha=.4, color='salmon', lw=3)
+m2_p2_trajectory = Trail(ax.plot([], [], alpha=.4, color='salmon', lw=3)[0], int(round(trail_time/delta_t)))
 line_m1_p2_back, = ax.plot([0,x1_p2[0]], [0,y1_p2[0]], '-', color='k', lw=4, solid_capstyle='round')
 line_m1_p2_front, = ax.plot([0,x1_p2[0]], [0,y1_p2[0]], '-', color='w', lw=2, solid_capstyle='round', zorder=2)
 m1_p2_dot, = ax.plot(x1_p2[0], y1_p2[0], 'o', markeredgecolor='black', markeredgewidth=1, color='salmon', markersize=m1_p2*10, zorder=3)
@@ -99,7 +91,7 @@ m2_p2_dot, = ax.plot(x2_p2[0], y2_p2[0], 'o', markeredgecolor='black', markeredg
 ################################################
 
 time_template = 'Time = {:3.1f}s'.format
-time_text = ax.text(-(L1_p1+L2_p1)*0.25,-(L1_p1+L2_p1)*1.25, time_template(0),fontsize=20, style='italic',bbox={'facecolor': 'white', 'alpha': 1, 'pad': 10})
+time_text = text_axes(fig, -(L1_p1+L2_p1)*0.25,-(L1_p1+L2_p1)*1.25, time_template(0),transform=ax.transData,fontsize=20, style='italic',bbox={'facecolor': 'white', 'alpha': 1, 'pad': 10})
 
 ax.set_xticks([])
 ax.set_yticks([])
@@ -108,7 +100,7 @@ ax.set_ylim((-L1_p1-L2_p1)*1.1,(L1_p1+L2_p1)*1.1)
 
 def animate(i):
     # First pendulum 
-    m2_p1_trajectory.set_data(x2_p1[:i], y2_p1[:i])
+    m2_p1_trajectory.follow(x2_p1, y2_p1, i)
     line_m1_p1_back.set_data([0,x1_p1[i]],[0,y1_p1[i]])
     line_m1_p1_front.set_data([0,x1_p1[i]],[0,y1_p1[i]])
     line_m2_p1_back.set_data([x1_p1[i],x2_p1[i]],[y1_p1[i],y2_p1[i]])
@@ -117,7 +109,7 @@ def animate(i):
     m2_p1_dot.set_data([x2_p1[i]], [y2_p1[i]])
     
     # Second pendulum 
-    m2_p2_trajectory.set_data(x2_p2[:i], y2_p2[:i])
+    m2_p2_trajectory.follow(x2_p2, y2_p2, i)
     line_m1_p2_back.set_data([0,x1_p2[i]],[0,y1_p2[i]])
     line_m1_p2_front.set_data([0,x1_p2[i]],[0,y1_p2[i]])
     line_m2_p2_back.set_data([x1_p2[i],x2_p2[i]],[y1_p2[i],y2_p2[i]])
@@ -125,10 +117,12 @@ def animate(i):
     m1_p2_dot.set_data([x1_p2[i]], [y1_p2[i]])
     m2_p2_dot.set_data([x2_p2[i]], [y2_p2[i]])
     time_text.set_text(time_template(t[i]))
+    return (m2_p1_trajectory.line, line_m1_p1_back, line_m1_p1_front, line_m2_p1_back, line_m2_p1_front, m1_p1_dot, m2_p1_dot,
+            m2_p2_trajectory.line, line_m1_p2_back, line_m1_p2_front, line_m2_p2_back, line_m2_p2_front, m1_p2_dot, m2_p2_dot,
+            time_text)
 
 fps = 25
-every_x_frame = 1 / (delta_t*fps)
-an = FuncAnimation(fig, animate, frames= np.arange(0,len(t),int(every_x_frame)), interval=20, repeat=False)
+an = blit_animation(fig, animate, frame_indices(t, fps), fps=fps)
 plt.show()
 ################################################
 # an.save("double_pend_gif.gif", writer=PillowWriter(fps=50))
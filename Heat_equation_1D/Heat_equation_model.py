@@ -1,8 +1,114 @@
+import os
+import sys
+import time
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter
+from matplotlib.animation import PillowWriter
+from scipy.linalg import lapack
 
-def calc_1D_flux(a,b,nx,tmax,alfa,k,fa,fb,T0):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Animation'))
+from fast_animation import Trail, blit_animation, frame_indices, text_axes
+
+# Peso implícito del esquema theta para cada método de calc_1D_flux
+THETA_METHODS = {'explicit':0,'crank-nicolson':0.5,'implicit':1}
+
+def flux_steps(a,b,nx,tmax,alfa,k,fa,fb,T0,dt=0.05,method='explicit'):
+    # Generador con el avance temporal de calc_1D_flux: devuelve (t, T) en cada
+    # paso. T es un buffer de nx+1 nodos que se reutiliza, copiarlo si se guarda.
+    # method: 'explicit' (estable si lamb <= 0.5), 'implicit' (Euler implícito)
+    # o 'crank-nicolson'. Los dos últimos son incondicionalmente estables.
+    if method not in THETA_METHODS:
+        raise ValueError(f"method must be one of {list(THETA_METHODS)}, got {method!r}")
+    theta = THETA_METHODS[method]
+    m = (b-a)/nx
+    nt = int(tmax/dt)
+    p = tmax/nt
+    lamb = alfa*p/m**2
+    if theta == 0 and lamb > 0.5:
+        raise ValueError(f"Explicit scheme is unstable with lamb = {lamb:.3f} > 0.5: "
+                         "reduce dt or use method='implicit' / 'crank-nicolson'")
+    # Término de flujo en los extremos (Neumann): fa entra por x=a y fb por x=b.
+    s = np.zeros(nx+1)
+    s[0] = 2*lamb*fa*m/k
+    s[-1] = 2*lamb*fb*m/k
+    # Parte explícita del esquema theta: c = (1-theta)*lamb
+    c = (1-theta)*lamb
+    if theta > 0:
+        # Matriz tridiagonal (I - theta*lamb*D), constante: se factoriza una sola vez.
+        dl = np.full(nx,-theta*lamb)
+        d = np.full(nx+1,1+2*theta*lamb)
+        du = np.full(nx,-theta*lamb)
+        du[0] = dl[-1] = -2*theta*lamb
+        dl,d,du,du2,ipiv,_ = lapack.dgttrf(dl,d,du)
+    T = np.empty(nx+1)
+    T[:] = T0
+    yield 0.0,T
+    # Nodos fantasma: el nodo vecino se refleja en los extremos, de modo que
+    # el contorno se calcula en la misma pasada que el interior.
+    Tg = np.empty(nx+3)
+    for t_ in range(nt):
+        Tg[1:-1] = T
+        Tg[0] = T[1]
+        Tg[-1] = T[-2]
+        rhs = (1-2*c)*Tg[1:-1]+c*(Tg[2:]+Tg[:-2])+s
+        if theta > 0:
+            rhs,_ = lapack.dgttrs(dl,d,du,du2,ipiv,rhs)
+        T[:] = rhs
+        yield (t_+1)*p,T
+
+def calc_1D_flux(a,b,nx,tmax,alfa,k,fa,fb,T0,dt=0.05,method='explicit'):
+    x = np.linspace(0,b,nx+1)
+    nt = int(tmax/dt)
+    t = np.linspace(0,tmax,nt+1)
+    temp = np.zeros((nt+1, nx+1)) #t, x
+    for t_,(_,T) in enumerate(flux_steps(a,b,nx,tmax,alfa,k,fa,fb,T0,dt,method)):
+        temp[t_] = T
+    return temp,t,x
+
+class RingBuffer:
+    # Buffer circular de tamaño fijo: guarda las últimas `size` filas [t, valores].
+    def __init__(self,size,width):
+        self.data = np.zeros((size,width+1))
+        self.n = 0
+
+    def append(self,t,row):
+        i = self.n % len(self.data)
+        self.data[i,0] = t
+        self.data[i,1:] = row
+        self.n += 1
+
+    def values(self):
+        # Filas en orden cronológico
+        if self.n <= len(self.data):
+            return self.data[:self.n]
+        i = self.n % len(self.data)
+        return np.concatenate((self.data[i:],self.data[:i]))
+
+def calc_1D_flux_stream(a,b,nx,tmax,alfa,k,fa,fb,T0,dt=0.05,method='explicit',every=10,probes=(),history=100):
+    # Versión en streaming de calc_1D_flux, memoria O(nx) sea cual sea tmax.
+    # Cada `every` pasos (y en el último) devuelve (snapshots, probe_trace):
+    #   snapshots   -> RingBuffer con las últimas `history` instantáneas [t, T(x)]
+    #   probe_trace -> RingBuffer con [t, T(probes)] de los últimos history*every pasos
+    # Las sondas se comprueban al llamar, antes de empezar a iterar.
+    probes = np.atleast_1d(np.asarray(probes,dtype=float))
+    fuera = probes[(probes < a) | (probes > b)]
+    if len(fuera):
+        raise ValueError(f"probes must lie in [a, b] = [{a}, {b}], got {fuera.tolist()}")
+    idx = np.rint((probes-a)/((b-a)/nx)).astype(int)
+    return _flux_stream(a,b,nx,tmax,alfa,k,fa,fb,T0,dt,method,every,idx,history)
+
+def _flux_stream(a,b,nx,tmax,alfa,k,fa,fb,T0,dt,method,every,idx,history):
+    nt = int(tmax/dt)
+    snapshots = RingBuffer(history,nx+1)
+    probe_trace = RingBuffer(history*every,len(idx))
+    for t_,(tt,T) in enumerate(flux_steps(a,b,nx,tmax,alfa,k,fa,fb,T0,dt,method)):
+        probe_trace.append(tt,T[idx])
+        if t_ % every == 0 or t_ == nt:
+            snapshots.append(tt,T)
+            yield snapshots,probe_trace
+
+def calc_1D_flux_loop(a,b,nx,tmax,alfa,k,fa,fb,T0):
+    # Versión original nodo a nodo, se mantiene como referencia para el benchmark.
     m = (b-a)/nx
     x = np.linspace(0,b,nx+1)
     nt = int(tmax/0.05)
@@ -18,6 +124,22 @@ def calc_1D_flux(a,b,nx,tmax,alfa,k,fa,fb,T0):
             temp[t_+1,x_] = (1-2*lamb)*temp[t_,x_]+lamb*(temp[t_,x_+1]+temp[t_,x_-1])
     return temp,t,x
 
+def benchmark_flux(nx_list=(20,200,1000),tmax=10,alfa=1E-7,k=0.2,fa=1000,fb=-500,T0=20):
+    # alfa bajo (polímero) para que el esquema explícito sea estable con nx grande
+    print(f'{"nx":>6} {"loop (s)":>10} {"vector (s)":>11} {"speed-up":>9} {"max |dif|":>10}')
+    for nx_ in nx_list:
+        t0 = time.perf_counter()
+        res_loop,_,_ = calc_1D_flux_loop(0,0.2,nx_,tmax,alfa,k,fa,fb,T0)
+        t1 = time.perf_counter()
+        res_vec,_,_ = calc_1D_flux(0,0.2,nx_,tmax,alfa,k,fa,fb,T0)
+        t2 = time.perf_counter()
+        print(f'{nx_:>6} {t1-t0:>10.4f} {t2-t1:>11.4f} {(t1-t0)/(t2-t1):>9.1f} {np.abs(res_loop-res_vec).max():>10.2e}')
+
+# Swich to True to compare the vectorized solver against the loop version
+run_benchmark = False
+if run_benchmark:
+    benchmark_flux()
+
 a = 0
 b = 0.2
 T0 = 20
@@ -33,18 +155,20 @@ fb = -50000
 res,t,x = calc_1D_flux(a,b,nx,tmax,alfa,k,fa,fb,T0)
 
 p_estudio = 0.02
+fps = 25
+speed = 5 # segundos simulados por segundo de animación
 limite = round(1.05*np.amax(res),-1)
 
 f, (ax1,ax2) = plt.subplots(2,1,figsize=(7,8),facecolor='.85')
 time_template = 'Time = {:4.2f} s.'.format
 text_args = dict(fontsize=15,ha='center', va='center', style='italic',bbox={'facecolor': 'white', 'alpha': 1, 'pad': 5})
-time_text = ax1.text(b*.5,limite+limite*.1, time_template(0),**text_args)
+time_text = text_axes(f, b*.5,limite+limite*.1, time_template(0),transform=ax1.transData,**text_args)
 ax1.set_xlabel('Height (mm)',fontsize=12)
 ax1.set_ylabel('Temp. ($^\circ$C)',fontsize=12)
 ax2.set_xlabel('Time (s)',fontsize=12)
 ax2.set_ylabel('Temp. ($^\circ$C)',fontsize=12)
 ax1.set_ylim(0, limite)
-ax1.set_xlim(0, b)
+ax1.set_xlim(-.01*b, 1.01*b) # keeps the boundary nodes inside the blitted region
 
 line, = ax1.plot([],[], 'k')
 p_est_scat = ax1.scatter(p_estudio, 20, c='blue',s=200,alpha=.2)
@@ -55,22 +179,19 @@ ax1.scatter(x, res[0], c='k',s=10,alpha=.2)
 f.suptitle('1D Heat Equation',fontsize=14,x=0.5,y=.98,weight='semibold')
 index = np.where(x == p_estudio)
 ax2.plot(t,res[:,index[0]],'b',linewidth=.5,alpha=.2)
-lineax2, = ax2.plot([],[],'b')
+lineax2 = Trail(ax2.plot([],[],'b')[0], len(t))
 scatax2 = ax2.scatter([],[], c='b',s=20)
 
-def init():
-    pass
-
 def anim(i):
     time_text.set_text(time_template(t[i]))
     line.set_data(x,res[i])
     scat.set_offsets(np.c_[x,res[i]])
     p_est_scat.set_offsets(np.c_[p_estudio,res[i,index[0]]])
-    lineax2.set_data(t[:i],res[:i,index[0]])
+    lineax2.follow(t,res[:,index[0][0]],i)
     scatax2.set_offsets(np.c_[t[i],res[i,index][0]])
-    return line
+    return line, scat, p_est_scat, lineax2.line, scatax2, time_text
 
-an = FuncAnimation(f, anim, frames=len(t), init_func=init,interval=10, repeat=False)
+an = blit_animation(f, anim, frame_indices(t, fps, speed), fps=fps)
 plt.show()
 ################################################
 # an.save("Heat_equation_gif.gif", writer=PillowWriter(fps=50))
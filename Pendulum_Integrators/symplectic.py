@@ -0,0 +1,185 @@
+# Symplectic integrators shared by the pendulum models (Damped_Pendulum, Double_Pendulum).
+# Every step function has the signature step(q, v, h, *args) -> q, v so that schemes
+# can be composed (yoshida4) or wrapped (damped) and driven by integrate().
+import time
+import numpy as np
+
+g = 9.81 # The gravitational acceleration (m.s-2).
+
+# Triple-jump weights that turn a symmetric 2nd order step into a 4th order one
+_cbrt2 = 2**(1/3)
+YOSHIDA4 = (1/(2-_cbrt2), -_cbrt2/(2-_cbrt2), 1/(2-_cbrt2))
+
+def symplectic_euler(q, v, h, accel):
+    """Semi-implicit Euler for q'' = accel(q, v): velocity first, then position (1st order)."""
+    v = v + h*accel(q, v)
+    return q + h*v, v
+
+def verlet(q, v, h, accel):
+    """Velocity Verlet / leapfrog (kick-drift-kick) for the separable system q'' = accel(q)."""
+    v = v + h/2*accel(q)
+    q = q + h*v
+    return q, v + h/2*accel(q)
+
+def implicit_midpoint(q, p, h, dq, dp, tol=1e-12, maxiter=50):
+    """Implicit midpoint rule for the canonical system q' = dq(q, p), p' = dp(q, p).
+
+    Symplectic for non-separable Hamiltonians (e.g. the double pendulum); the
+    implicit equation is solved by fixed-point iteration from an explicit Euler guess.
+    """
+    q1, p1 = q + h*dq(q, p), p + h*dp(q, p)
+    for _ in range(maxiter):
+        qm, pm = (q + q1)/2, (p + p1)/2
+        q2, p2 = q + h*dq(qm, pm), p + h*dp(qm, pm)
+        err = max(np.max(np.abs(q2 - q1)), np.max(np.abs(p2 - p1)))
+        q1, p1 = q2, p2
+        if err < tol:
+            break
+    return q1, p1
+
+def yoshida4(step):
+    """4th order composition (Yoshida triple jump) of a symmetric 2nd order step."""
+    def step4(q, v, h, *args):
+        for w in YOSHIDA4:
+            q, v = step(q, v, w*h, *args)
+        return q, v
+    return step4
+
+def damped(step, k):
+    """Add linear damping v' = -k v to a conservative step by Strang splitting.
+
+    The damping flow is solved exactly, so symplectic steps become conformal
+    symplectic: the phase-space area contracts at exactly the physical rate.
+    The splitting is symmetric but only 2nd order; for 4th order compose the
+    damped step, yoshida4(damped(verlet, k)), not the other way round.
+    """
+    def step_damped(q, v, h, *args):
+        v = v*np.exp(-k*h/2)
+        q, v = step(q, v, h, *args)
+        return q, v*np.exp(-k*h/2)
+    return step_damped
+
+def integrate(step, q0, v0, t, *args, substeps=1):
+    """Advance (q0, v0) over the uniform time grid t with `substeps` steps per interval.
+
+    Returns the arrays q, v with shape (len(t),) + np.shape(q0).
+    """
+    h = (t[1] - t[0])/substeps
+    q_out = np.empty((len(t),) + np.shape(q0))
+    v_out = np.empty((len(t),) + np.shape(v0))
+    q_out[0], v_out[0] = q, v = q0, v0
+    for i in range(1, len(t)):
+        for _ in range(substeps):
+            q, v = step(q, v, h, *args)
+        q_out[i], v_out[i] = q, v
+    return q_out, v_out
+
+################################################
+# Pendulum models
+
+def pendulum_accel(L):
+    """Acceleration theta'' = -g/L sin(theta) of the simple pendulum."""
+    return lambda theta, *_: -g/L*np.sin(theta)
+
+def damped_pendulum_sweep(k, L, theta_0, theta_dot_0, t, scheme='yoshida4', substeps=1):
+    """Integrate a batch of damped pendulums theta'' = -k theta' - g/L sin(theta) at once.
+
+    k, L, theta_0 and theta_dot_0 broadcast together, one pendulum per element;
+    scheme is 'euler' (semi-implicit), 'verlet' or 'yoshida4'. Only the points
+    of t are stored, so long runs can use a coarse t with many substeps.
+    Returns theta, theta_dot with shape (len(t),) + broadcast shape.
+    """
+    k, L, theta_0, theta_dot_0 = (np.array(a, dtype=float) for a in np.broadcast_arrays(k, L, theta_0, theta_dot_0))
+    if scheme == 'euler':
+        return integrate(symplectic_euler, theta_0, theta_dot_0, t,
+                         lambda x, x_dot: -k*x_dot - g/L*np.sin(x), substeps=substeps)
+    step = damped(verlet, k) if scheme == 'verlet' else yoshida4(damped(verlet, k))
+    return integrate(step, theta_0, theta_dot_0, t, pendulum_accel(L), substeps=substeps)
+
+def pendulum_energy(theta, theta_dot, L):
+    """Total energy per unit mass of the simple pendulum."""
+    return 0.5*(L*theta_dot)**2 - g*L*np.cos(theta)
+
+def double_pendulum_hamiltonian(L1, L2, m1, m2):
+    """Canonical equations of the double pendulum, q = (theta1, theta2), p = (p1, p2).
+
+    Returns dq(q, p), dp(q, p), momenta(q, omega) and energy(q, p); dq(q, p) is
+    also the conversion back to angular velocities omega.
+    """
+    def velocities(q, p):
+        # omega = M(q)^-1 p with the 2x2 mass matrix M solved in closed form
+        c = np.cos(q[0] - q[1])
+        a, b, d = (m1+m2)*L1**2, m2*L1*L2*c, m2*L2**2
+        det = a*d - b*b
+        return np.array([d*p[0] - b*p[1], a*p[1] - b*p[0]]) / det
+
+    def momenta(q, omega):
+        c = np.cos(q[0] - q[1])
+        return np.array([(m1+m2)*L1**2*omega[0] + m2*L1*L2*c*omega[1],
+                         m2*L2**2*omega[1] + m2*L1*L2*c*omega[0]])
+
+    def dp(q, p):
+        w1, w2 = velocities(q, p)
+        coupling = m2*L1*L2*np.sin(q[0] - q[1])*w1*w2
+        return np.array([-coupling - (m1+m2)*g*L1*np.sin(q[0]),
+                         coupling - m2*g*L2*np.sin(q[1])])
+
+    def energy(q, p):
+        w = velocities(q, p)
+        return 0.5*np.sum(p*w, axis=0) - (m1+m2)*g*L1*np.cos(q[0]) - m2*g*L2*np.cos(q[1])
+
+    return velocities, dp, momenta, energy
+
+################################################
+
+def _rk4(q, v, h, f):
+    # Classical RK4 on the first order system (q, v)' = f(q, v), for reference
+    k1 = f(q, v)
+    k2 = f(q + h/2*k1[0], v + h/2*k1[1])
+    k3 = f(q + h/2*k2[0], v + h/2*k2[1])
+    k4 = f(q + h*k3[0], v + h*k3[1])
+    return (q + h/6*(k1[0] + 2*k2[0] + 2*k3[0] + k4[0]),
+            v + h/6*(k1[1] + 2*k2[1] + 2*k3[1] + k4[1]))
+
+def _report(name, dt, E, elapsed):
+    drift = np.abs(E/E[0] - 1)
+    print('{:>18s} {:>7g} {:>12.2e} {:>12.2e} {:>9.3f}'.format(name, dt, drift.max(), drift[-1], elapsed))
+
+def benchmark(tmax=200, steps=(0.001, 0.01, 0.05), double_steps=(0.01, 0.02)):
+    """Print the relative energy drift (maximum and at tmax) and the cost of each scheme."""
+    header = '{:>18s} {:>7s} {:>12s} {:>12s} {:>9s}'.format('scheme', 'dt', 'max |dE/E|', 'end |dE/E|', 'time (s)')
+    L = 1
+    accel = pendulum_accel(L)
+    pend = {'symplectic euler': (symplectic_euler, (accel,)),
+            'verlet': (verlet, (accel,)),
+            'yoshida4': (yoshida4(verlet), (accel,)),
+            'rk4': (_rk4, (lambda q, v: (v, accel(q)),))}
+    print('Simple pendulum, {:g} s'.format(tmax))
+    print(header)
+    for dt in steps:
+        t = np.arange(0, tmax, dt)
+        for name, (step, args) in pend.items():
+            t0 = time.perf_counter()
+            q, v = integrate(step, 0., np.pi, t, *args)
+            _report(name, dt, pendulum_energy(q, v, L), time.perf_counter() - t0)
+
+    # Non-separable: the 2nd order midpoint rule is less accurate than RK4 per
+    # step, but its energy error stays bounded while the RK4 error keeps growing
+    L1, L2, m1, m2 = 3, 2, 2, 3
+    dq, dp, momenta, energy = double_pendulum_hamiltonian(L1, L2, m1, m2)
+    q0 = np.radians([90., -180.])
+    p0 = momenta(q0, np.radians([45., -20.]))
+    dbl = {'midpoint': (implicit_midpoint, (dq, dp)),
+           'yoshida4 midpoint': (yoshida4(implicit_midpoint), (dq, dp)),
+           'rk4': (_rk4, (lambda q, p: (dq(q, p), dp(q, p)),))}
+    print('\nDouble pendulum, {:g} s'.format(tmax))
+    print(header)
+    for dt in double_steps:
+        t = np.arange(0, tmax, dt)
+        for name, (step, args) in dbl.items():
+            t0 = time.perf_counter()
+            q, p = integrate(step, q0, p0, t, *args)
+            _report(name, dt, energy(q.T, p.T), time.perf_counter() - t0)
+
+if __name__ == '__main__':
+    benchmark()
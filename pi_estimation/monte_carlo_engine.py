@@ -0,0 +1,251 @@
+# Monte Carlo engine shared by pi_monte_carlo_ntimes.py and monte_carlo_integration.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.stats import norm, qmc
+
+def estimate_pi(ntimes, npoints, rng, max_points=2**22):
+    # One pi estimate per repetition, drawn as an (ntimes, npoints) block of
+    # points processed in chunks of at most max_points points to bound memory.
+    pi_estimation = np.empty(ntimes)
+    rows = max(1, max_points // npoints)
+    for start in range(0, ntimes, rows):
+        stop = min(start + rows, ntimes)
+        x_rand = rng.random((stop - start, npoints))  # Random x coordinate
+        y_rand = rng.random((stop - start, npoints))  # Random y coordinate
+        x_rand -= 0.5
+        y_rand -= 0.5
+        x_rand *= x_rand
+        y_rand *= y_rand
+        x_rand += y_rand
+        inside = np.count_nonzero(x_rand < 0.25, axis=1)
+        pi_estimation[start:stop] = 4*inside/npoints
+    return pi_estimation
+
+INTEGRATION_METHODS = ('uniform', 'stratified', 'antithetic', 'control', 'sobol', 'halton')
+QMC_REPLICAS = 16 # Independent randomizations of the quasi-Monte Carlo methods
+
+def evaluations(method, nsamples):
+    # Number of evaluations of f that one repetition of `method` really uses
+    # when nsamples are requested: pairs for stratified and antithetic, and
+    # QMC_REPLICAS blocks of points for QMC, a power of two for Sobol.
+    if method in ('stratified', 'antithetic'):
+        return max(1, nsamples//2)*2
+    if method in ('sobol', 'halton'):
+        n = max(1, nsamples//QMC_REPLICAS)
+        return QMC_REPLICAS*(2**(n.bit_length() - 1) if method == 'sobol' else n)
+    return nsamples
+
+def _integrate_rows(f, a, b, nsamples, rng, rows, method, control):
+    # Estimates and estimator variances for `rows` repetitions of a Monte Carlo
+    # method that uses evaluations(method, nsamples) evaluations of the
+    # vectorized integrand f each.
+    width = b-a
+    if method == 'uniform':
+        y = width*f(rng.uniform(a, b, (rows, nsamples)))
+        return y.mean(axis=1), y.var(axis=1, ddof=1)/nsamples
+    if method == 'stratified':
+        # Two samples in each of m = nsamples/2 equal-width strata. The estimate
+        # is the mean of the stratum means, so its variance is the sum of the
+        # within-stratum variances (y1-y2)^2/2 of each stratum mean, over 2 m^2.
+        m = max(1, nsamples//2)
+        u = (np.arange(m)[:, None] + rng.random((rows, m, 2)))/m
+        y = width*f(a + width*u)
+        d = y[:, :, 0] - y[:, :, 1]
+        return y.mean(axis=(1, 2)), np.sum(d**2, axis=1)/(4*m**2)
+    if method == 'antithetic':
+        # nsamples/2 pairs (x, a+b-x)
+        x = rng.uniform(a, b, (rows, nsamples//2))
+        y = width*(f(x) + f(a+b-x))/2
+        return y.mean(axis=1), y.var(axis=1, ddof=1)/y.shape[1]
+    if method == 'control':
+        # Control variate g with known integral G; by default the parabola
+        # (x-a)(b-x), whose integral is (b-a)^3/6. beta is fitted per repetition.
+        g, G = control if control is not None else (lambda x: (x-a)*(b-x), width**3/6)
+        x = rng.uniform(a, b, (rows, nsamples))
+        y = width*f(x)
+        c = width*g(x)
+        cc = c - c.mean(axis=1, keepdims=True)
+        beta = np.sum((y - y.mean(axis=1, keepdims=True))*cc, axis=1)/np.sum(cc**2, axis=1)
+        z = y - beta[:, None]*(c - G)
+        return z.mean(axis=1), z.var(axis=1, ddof=1)/nsamples
+    # Randomized quasi-Monte Carlo: 16 independent randomizations of nsamples/16
+    # points each, the variance comes from the spread between them. All of them
+    # come from one engine call: for Sobol, the 16 independently scrambled
+    # dimensions of one engine, with n rounded down to a power of two since
+    # Sobol points are only balanced in blocks of 2^m; for Halton, whose higher
+    # dimensions (larger prime bases) fill [0, 1) slowly, 16 random shifts
+    # modulo 1 of one scrambled sequence.
+    replicas = QMC_REPLICAS
+    n = max(1, nsamples//replicas)
+    estimates, variances = np.empty(rows), np.empty(rows)
+    for k in range(rows):
+        if method == 'sobol':
+            u = qmc.Sobol(replicas, scramble=True, seed=rng).random_base2(n.bit_length() - 1)
+        else:
+            u = (qmc.Halton(1, scramble=True, seed=rng).random(n) + rng.random(replicas)) % 1
+        means = width*f(a + width*u).mean(axis=0)
+        estimates[k], variances[k] = means.mean(), means.var(ddof=1)/replicas
+    return estimates, variances
+
+def integrate(ntimes, nsamples, rng, a=0, b=np.pi, f=np.sin, method='uniform', control=None, max_points=2**22):
+    # Integral of the vectorized integrand f over [a, b], repeated ntimes, each
+    # repetition using about nsamples evaluations of f (exactly
+    # evaluations(method, nsamples)) with the given variance reduction method
+    # (see INTEGRATION_METHODS). control=(g, G) sets the
+    # control variate for method='control'. Returns (estimates, variances), the
+    # variance being the estimated variance of each estimate.
+    if method not in INTEGRATION_METHODS:
+        raise ValueError(f"method must be one of {INTEGRATION_METHODS}, got {method!r}")
+    estimates, variances = np.empty(ntimes), np.empty(ntimes)
+    rows = max(1, max_points // nsamples)
+    for start in range(0, ntimes, rows):
+        stop = min(start + rows, ntimes)
+        estimates[start:stop], variances[start:stop] = _integrate_rows(f, a, b, nsamples, rng, stop-start, method, control)
+    return estimates, variances
+
+def estimate_integral(ntimes, nsamples, rng, a=0, b=np.pi, f=np.sin, method='uniform', control=None, max_points=2**22):
+    # One estimate of the integral of f over [a, b] per repetition (see integrate)
+    return integrate(ntimes, nsamples, rng, a, b, f, method, control, max_points)[0]
+
+def variance_report(f, a, b, nsamples, rng, ntimes=200, exact=None):
+    # Prints, for every method, the evaluations of f it really used when asked
+    # for nsamples, the mean reported variance, the observed spread of the
+    # estimates and the variance gain over uniform sampling per evaluation
+    # (reported variance times evaluations, uniform / method).
+    print(f'{"method":>11} {"evals":>7} {"estimate":>10} {"reported var":>13} {"observed var":>13} {"gain":>9}')
+    base = None
+    for method in INTEGRATION_METHODS:
+        estimates, variances = integrate(ntimes if method not in ('sobol', 'halton') else ntimes//10,
+                                         nsamples, rng, a, b, f, method)
+        evals = evaluations(method, nsamples)
+        cost = variances.mean()*evals
+        base = base or cost
+        err = f' {abs(estimates.mean()-exact):.1e}' if exact is not None else ''
+        print(f'{method:>11} {evals:>7} {estimates.mean():>10.6f} {variances.mean():>13.3e} '
+              f'{estimates.var(ddof=1):>13.3e} {base/cost:>9.1f}{err}')
+
+class RunningStats:
+    # Streaming statistics of a stream of estimates in O(1) memory: Welford
+    # mean/variance (batches merged with Chan's parallel formula) and a
+    # histogram with fixed bins over hist_range, plus under/overflow counters.
+    # Without bins only the mean and variance are tracked.
+    def __init__(self, bins=None, hist_range=None):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.edges = np.linspace(hist_range[0], hist_range[1], bins+1) if bins else None
+        self.counts = np.zeros(bins or 0, dtype=np.int64)
+        self.below = 0
+        self.above = 0
+
+    def _combine(self, n, mean, m2):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta*n/total
+        self.m2 += m2 + delta**2*self.n*n/total
+        self.n = total
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return self
+        mean = values.mean()
+        self._combine(len(values), mean, np.sum((values-mean)**2))
+        if self.edges is None:
+            return self
+        self.counts += np.histogram(values, self.edges)[0]
+        self.below += np.count_nonzero(values < self.edges[0])
+        self.above += np.count_nonzero(values > self.edges[-1])
+        return self
+
+    def merge(self, other):
+        if other.n:
+            self._combine(other.n, other.mean, other.m2)
+            self.counts += other.counts
+            self.below += other.below
+            self.above += other.above
+        return self
+
+    @property
+    def std(self):
+        # Population standard deviation, as np.std
+        return np.sqrt(self.m2/self.n) if self.n else np.nan
+
+    def snapshot(self):
+        # Current state: (n, mean, std, histogram counts, bin edges)
+        edges = self.edges.copy() if self.edges is not None else None
+        return self.n, self.mean, self.std, self.counts.copy(), edges
+
+def integrate_adaptive(f, lower, upper, tol, rng, batch=2**16, confidence=0.95, max_samples=10**9):
+    # Integral of f over the box [lower, upper] (d dimensions). f receives an
+    # (n, d) array of points and returns n values. Samples are drawn in batches
+    # of `batch` points, so memory is bounded, until the half-width of the
+    # confidence interval drops below tol or max_samples is reached.
+    # Returns (estimate, half_width, number of samples).
+    lower = np.atleast_1d(np.asarray(lower, dtype=float))
+    upper = np.atleast_1d(np.asarray(upper, dtype=float))
+    volume = np.prod(upper - lower)
+    z = norm.ppf(0.5 + confidence/2)
+    stats = RunningStats()
+    half_width = np.inf
+    while stats.n < max_samples:
+        x = lower + (upper - lower)*rng.random((min(batch, max_samples - stats.n), len(lower)))
+        stats.update(volume*f(x))
+        half_width = z*np.sqrt(stats.m2/(stats.n - 1)/stats.n) if stats.n > 1 else np.inf
+        if half_width <= tol:
+            break
+    return stats.mean, half_width, stats.n
+
+def _run_chunk(estimator, ntimes, seed_seq, kwargs):
+    return estimator(ntimes, rng=np.random.default_rng(seed_seq), **kwargs)
+
+def parallel_estimates(estimator, ntimes, seed=None, n_workers=None, **kwargs):
+    # Splits the ntimes repetitions of estimator(ntimes, rng=..., **kwargs) over
+    # n_workers processes. Worker k draws from the k-th child of
+    # SeedSequence(seed).spawn(n_workers), so for a given seed and worker count
+    # the merged result is bit-identical from run to run.
+    # Scripts calling it with n_workers > 1 need an if __name__ == '__main__' guard.
+    n_workers = n_workers or os.cpu_count()
+    seed_seqs = np.random.SeedSequence(seed).spawn(n_workers)
+    sizes = [len(c) for c in np.array_split(np.arange(ntimes), n_workers)]
+    if n_workers == 1:
+        return _run_chunk(estimator, ntimes, seed_seqs[0], kwargs)
+    with ProcessPoolExecutor(n_workers) as pool:
+        parts = pool.map(_run_chunk, [estimator]*n_workers, sizes, seed_seqs, [kwargs]*n_workers)
+        return np.concatenate(list(parts))
+
+def _stats_chunk(estimator, ntimes, seed_seq, kwargs, bins, hist_range, batch):
+    rng = np.random.default_rng(seed_seq)
+    stats = RunningStats(bins, hist_range)
+    for start in range(0, ntimes, batch):
+        stats.update(estimator(min(batch, ntimes-start), rng=rng, **kwargs))
+    return stats
+
+def _pilot_range(estimator, seed_seq, kwargs, n=100, width=5):
+    # Histogram range mean +- width standard deviations of n pilot estimates
+    values = estimator(n, rng=np.random.default_rng(seed_seq), **kwargs)
+    mean, half = np.mean(values), width*np.std(values, ddof=1)
+    half = half or 1e-9*max(1, abs(mean))  # identical pilot estimates
+    return mean - half, mean + half
+
+def parallel_stats(estimator, ntimes, bins, hist_range=None, seed=None, n_workers=None, batch=1000, **kwargs):
+    # Same splitting and seeding as parallel_estimates, but each worker feeds its
+    # estimates in batches into a RunningStats instead of keeping them, and the
+    # partial accumulators are merged in worker order. Memory is O(batch).
+    # With hist_range=None the range is set to mean +- 5 std of a pilot batch
+    # drawn from an extra child of the seed, so it suits every method's spread.
+    n_workers = n_workers or os.cpu_count()
+    seed_seqs = np.random.SeedSequence(seed).spawn(n_workers + 1)
+    if hist_range is None:
+        hist_range = _pilot_range(estimator, seed_seqs[-1], kwargs)
+    sizes = [len(c) for c in np.array_split(np.arange(ntimes), n_workers)]
+    if n_workers == 1:
+        return _stats_chunk(estimator, ntimes, seed_seqs[0], kwargs, bins, hist_range, batch)
+    with ProcessPoolExecutor(n_workers) as pool:
+        parts = list(pool.map(_stats_chunk, [estimator]*n_workers, sizes, seed_seqs[:n_workers], [kwargs]*n_workers,
+                              [bins]*n_workers, [hist_range]*n_workers, [batch]*n_workers))
+    stats = RunningStats(bins, hist_range)
+    for part in parts:
+        stats.merge(part)
+    return stats
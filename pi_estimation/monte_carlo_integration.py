@@ -1,29 +1,38 @@
 # Monte Carlo integration
 import numpy as np
 import matplotlib.pyplot as plt
+from monte_carlo_engine import estimate_integral, integrate_adaptive, parallel_stats
 
 a = 0 # lower boundary
 b = np.pi # upper boundary
 N = 10000 # Number of iterations
-areas =[]
+seed = 0
+n_workers = 1 # Number of processes (None -> all cores)
+method = 'uniform' # 'uniform', 'stratified', 'antithetic', 'control', 'sobol' or 'halton'
+tol = 1e-3 # Target half-width of the 95% confidence interval for the adaptive integrator
+bins = 31
+hist_range = None # Histogram range, e.g. (1.95, 2.05); None -> mean ± 5 std of a pilot batch
 
-for _ in range(N):
-    answer = (b-a)/N * np.sin(np.random.uniform(a,b,N)).sum()
-    areas.append(answer)
+if __name__ == '__main__':
+    # Adaptive integration: samples in batches until the requested accuracy is reached
+    area, half_width, n_used = integrate_adaptive(lambda x: np.sin(x[:,0]), [a], [b], tol, np.random.default_rng(seed))
+    print(f'Adaptive: area = {area:.5f} ± {half_width:.1e} (95%) with {n_used} samples')
 
-fig, ax = plt.subplots(figsize=(6,6))
+    stats = parallel_stats(estimate_integral, N, bins, hist_range, seed, n_workers, nsamples=N, a=a, b=b, f=np.sin, method=method)
+    _, mu, sigma, counts, edges = stats.snapshot()
+    if stats.below or stats.above:
+        print(f'{stats.below} estimates below and {stats.above} above the histogram range [{edges[0]:.4g}, {edges[-1]:.4g}]')
 
-ax.hist(areas, bins=31, ec='b')
+    fig, ax = plt.subplots(figsize=(6,6))
 
-mu = np.array(areas).mean()
-sigma = np.array(areas).std()
+    ax.hist(edges[:-1], edges, weights=counts, ec='b')
 
-textstr = f'$\mu=${mu:.2f}\n$\sigma=${sigma:.2f}'
-props = dict(boxstyle='round', facecolor='blue', alpha=0.1)
-ax.text(0.05, 0.95, textstr, transform=ax.transAxes, fontsize=14,
-        verticalalignment='top', bbox=props)
+    textstr = f'$\mu=${mu:.2f}\n$\sigma=${sigma:.2f}'
+    props = dict(boxstyle='round', facecolor='blue', alpha=0.1)
+    ax.text(0.05, 0.95, textstr, transform=ax.transAxes, fontsize=14,
+            verticalalignment='top', bbox=props)
 
-plt.title("Distribution of calculated areas")
-plt.xlabel("Area")
-# plt.savefig('Monte_Carlo_integration.png')
-plt.show()
+    plt.title("Distribution of calculated areas")
+    plt.xlabel("Area")
+    # plt.savefig('Monte_Carlo_integration.png')
+    plt.show()
@@ -1,44 +1,72 @@
 # Monte Carlo Pi Estimation
-import time
 import numpy as np
-from numpy import random
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, PillowWriter
 
 
 npoints = 5000
-w = 100 # Window size for moving average
-pi_estimation = []
+n_frames = 500 # Target number of frames, whatever npoints is
+points_per_frame = max(1, npoints//n_frames) # New random points drawn on each frame
+max_drawn = 20000 # Only the first max_drawn points are plotted (they are a uniform sample too)
+w = 100 # Window size for moving average (in frames)
+rng = np.random.default_rng()
+
+# Preallocated buffers: points inside/outside the circle are appended as they are drawn
+n_points = np.arange(points_per_frame, npoints+1, points_per_frame) # Nº of points after each frame
+n_buf = min(npoints, max_drawn)
+x_in, y_in = np.empty(n_buf), np.empty(n_buf)
+x_out, y_out = np.empty(n_buf), np.empty(n_buf)
+n_in = n_out = 0 # points inside/outside the circle
+d_in = d_out = 0 # of which stored in the buffers to be drawn
+pi_estimation = np.empty(len(n_points))
+media_movil = np.empty(len(n_points))
+window_sum = 0.
 
 def animate(i):
-    x_rand = random.rand(i)  # Random x coordinate
-    y_rand = random.rand(i)  # Random y coordinate
-    indexes = (x_rand-0.5)**2+(y_rand- 0.5)**2<0.25
-    xin = x_rand[indexes]
-    yin = y_rand[indexes]
-    xout = np.delete(x_rand,indexes)
-    yout = np.delete(y_rand,indexes)
-    pi_estimation.append(4*len(xin)/i)
-    if not i % 100:
-        time.sleep(.1)
-        lin.set_data(xin,yin)
-        lout.set_data(xout,yout)
-        l_pi_est.set_data(np.linspace(100,i,len(pi_estimation)),pi_estimation)
-        t1.set_text(points_template(i))
-        t2.set_text(pi_template(pi_estimation[-1],abs(np.pi-pi_estimation[-1])))
-        if len(pi_estimation)>200:
-            media_movil = np.convolve(pi_estimation, np.ones(w), 'valid') / w
-            x_media_movil = np.arange(100,100+len(pi_estimation)+1)[int(np.floor(w/2)):-int(np.ceil(w/2))]
-            l_pi_est_mean.set_data(x_media_movil,media_movil)
+    global n_in, n_out, d_in, d_out, window_sum
+    xy = rng.random((points_per_frame, 2))  # Random (x, y) coordinates
+    indexes = (xy[:,0]-0.5)**2+(xy[:,1]-0.5)**2<0.25
+    k_in = np.count_nonzero(indexes)
+    n_in += k_in
+    n_out += points_per_frame-k_in
+    if d_in+d_out < n_buf:
+        xy = xy[:n_buf-d_in-d_out]
+        indexes = indexes[:len(xy)]
+        k_in = np.count_nonzero(indexes)
+        k_out = len(xy)-k_in
+        x_in[d_in:d_in+k_in], y_in[d_in:d_in+k_in] = xy[indexes].T
+        x_out[d_out:d_out+k_out], y_out[d_out:d_out+k_out] = xy[~indexes].T
+        d_in += k_in
+        d_out += k_out
+    pi_estimation[i] = 4*n_in/n_points[i]
+    # Sliding window sum of the last w estimates, O(1) per frame
+    window_sum += pi_estimation[i]-(pi_estimation[i-w] if i >= w else 0)
+    lin.set_data(x_in[:d_in],y_in[:d_in])
+    lout.set_data(x_out[:d_out],y_out[:d_out])
+    l_pi_est.set_data(n_points[:i+1],pi_estimation[:i+1])
+    t1.set_text(points_template(n_points[i]))
+    t2.set_text(pi_template(pi_estimation[i],abs(np.pi-pi_estimation[i])))
+    if i >= w-1:
+        # Centred moving average
+        media_movil[i-w//2] = window_sum/w
+        l_pi_est_mean.set_data(n_points[w-1-w//2:i-w//2+1],media_movil[w-1-w//2:i-w//2+1])
+    return lin,lout,l_pi_est,l_pi_est_mean,t1,t2
 
 def init():
+    # Restart the sampler so the frames can be played again (e.g. an.save() before plt.show())
+    global n_in, n_out, d_in, d_out, window_sum
+    n_in = n_out = d_in = d_out = 0
+    window_sum = 0.
     lin.set_data([], [])
     lout.set_data([], [])
     l_pi_est.set_data([], [])
-    return lin,lout
+    l_pi_est_mean.set_data([], [])
+    t1.set_text(points_template(0))
+    t2.set_text(pi_template(0,0))
+    return lin,lout,l_pi_est,l_pi_est_mean,t1,t2
 
 f= plt.figure(figsize=(12,7),facecolor='.85')
-spec = f.add_gridspec(6,2)
+spec = f.add_gridspec(6,2,height_ratios=[1.4,1,1,1,1,1]) # top row tall enough to hold the blitted texts
 
 ax11 = f.add_subplot(spec[:1, :1])
 ax12 = f.add_subplot(spec[:1, 1:])
@@ -64,7 +92,7 @@ ax21.set_xticks([0.,0.5,1.])
 ax21.set_yticks([0.,0.5,1.])
 ax22.axhline(y=np.pi, color='r',alpha=.3)
 
-ax22.axis([100,npoints,2.8,3.5])
+ax22.axis([points_per_frame,npoints,2.8,3.5])
 ax22.set_yticks([2.6,2.8,3,3.2,3.4,3.6])
 
 ax11.axis('off')
@@ -74,7 +102,7 @@ ax22.text(npoints+.04*npoints,np.pi, 'π',fontsize=20,ha='center', va='center')
 ax22.legend([l_pi_est_mean],['mean'],loc=1)
 
 f.suptitle('Estimating Pi using Monte Carlo',fontsize=20,x=0.5,y=.95,weight='semibold')
-an = FuncAnimation(f, animate, frames= np.arange(100,npoints+1),init_func=init, interval=1, repeat=False)
+an = FuncAnimation(f, animate, frames=len(n_points),init_func=init, interval=1, blit=True, repeat=False)
 
 #save the animation
 # print('Saving animation...')
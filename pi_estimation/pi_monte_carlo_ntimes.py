@@ -1,30 +1,30 @@
 # Monte Carlo Pi Estimation
 import numpy as np
-from numpy import random
 import matplotlib.pyplot as plt
-from statistics import mean
+from monte_carlo_engine import estimate_pi, parallel_stats
 
 ntimes = 5000
 npoints = 10000
-pi_estimation = []
+seed = 0
+n_workers = 1 # Number of processes (None -> all cores)
+bins = 30
+hist_range = None # Histogram range, e.g. (3.06, 3.22); None -> mean ± 5 std of a pilot batch
 
-for i in range(ntimes):
-    x_rand = random.rand(npoints)  # Random x coordinate
-    y_rand = random.rand(npoints)  # Random y coordinate
-    inside = sum((x_rand-0.5)**2+(y_rand- 0.5)**2<0.25)
-    pi_estimation.append(4*inside/npoints)
+if __name__ == '__main__':
+    stats = parallel_stats(estimate_pi, ntimes, bins, hist_range, seed, n_workers, npoints=npoints)
+    _, mu, sigma, counts, edges = stats.snapshot()
+    if stats.below or stats.above:
+        print(f'{stats.below} estimates below and {stats.above} above the histogram range [{edges[0]:.4g}, {edges[-1]:.4g}]')
 
-f, ax = plt.subplots(figsize=(6,6))
-plt.title(f'Pi stimation.\nNº repetitions: {ntimes} | Nº points: {npoints}')
+    f, ax = plt.subplots(figsize=(6,6))
+    plt.title(f'Pi stimation.\nNº repetitions: {ntimes} | Nº points: {npoints}')
 
-mu = mean(pi_estimation)
-sigma = np.std(pi_estimation)
-textstr = f'$\mu=${mu:.4f}\n$\sigma=${sigma:.4f}'
-props = dict(boxstyle='round', facecolor='blue', alpha=0.1)
-ax.text(0.05, 0.95, textstr, transform=ax.transAxes, fontsize=14,
-        verticalalignment='top', bbox=props)
+    textstr = f'$\mu=${mu:.4f}\n$\sigma=${sigma:.4f}'
+    props = dict(boxstyle='round', facecolor='blue', alpha=0.1)
+    ax.text(0.05, 0.95, textstr, transform=ax.transAxes, fontsize=14,
+            verticalalignment='top', bbox=props)
 
-ax.hist(pi_estimation, 30, ec='b')
-ax.axvline(x=np.pi, color='r', linestyle='-')
-# plt.savefig('pi_estimation_n_times.png')
-plt.show()
+    ax.hist(edges[:-1], edges, weights=counts, ec='b')
+    ax.axvline(x=np.pi, color='r', linestyle='-')
+    # plt.savefig('pi_estimation_n_times.png')
+    plt.show()